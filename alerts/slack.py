@@ -4,13 +4,98 @@ Uses Slack Incoming Webhooks for notifications
 Triggers when ≥20% negative sentiment with top 3 negative texts
 """
 
+import atexit
+import functools
 import logging
 import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Alerts queued within this window are coalesced into a single webhook message
+_BATCH_WINDOW_SECONDS = 1.5
+# Up to 5 alerts per message keeps merged payloads under Slack's 50-block limit
+_MAX_BATCH_SIZE = 5
+# At interpreter exit, wait this long for queued alerts to be delivered
+_SHUTDOWN_TIMEOUT_SECONDS = 60
+
+# Shared keep-alive session so repeated alerts reuse the TLS connection to Slack
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503],
+        allowed_methods=frozenset({'POST'})
+    )
+))
+
+# Pending (payload, webhook_url, future) tuples drained by the flush worker
+_alert_queue = queue.Queue()
+# Only one webhook request is in flight at a time
+_post_lock = threading.Lock()
+_flush_thread = None
+_flush_thread_lock = threading.Lock()
+# Queued by the exit hook; the worker flushes what it has collected and stops
+_SHUTDOWN = object()
+
+# Static Block Kit scaffolding shared by every alert (never mutated)
+_HEADER_BLOCK = {
+    "type": "header",
+    "text": {
+        "type": "plain_text",
+        "text": "🚨 Branch Social Listening Alert"
+    }
+}
+_DIVIDER_BLOCK = {"type": "divider"}
+_FOOTER_BLOCK = {
+    "type": "context",
+    "elements": [
+        {
+            "type": "mrkdwn",
+            "text": "🤖 Branch Social Listening Scraper | Powered by Hugging Face Sentiment Analysis"
+        }
+    ]
+}
+
+def _dumps(payload: Dict[str, Any]) -> bytes:
+    """
+    Serialize a Slack payload to JSON bytes, using orjson when available
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode('utf-8')
+
+@functools.lru_cache(maxsize=8)
+def _validate_webhook(webhook_url: str) -> bool:
+    """
+    Check that a URL looks like a Slack incoming webhook (cached per URL)
+    """
+    return webhook_url.startswith('https://hooks.slack.com/')
+
+def _completed_future(result: bool) -> Future:
+    """
+    Wrap an already known result in a resolved Future
+    """
+    future = Future()
+    future.set_result(result)
+    return future
+
 def format_alert_message(negative_percentage: float, top_negative_mentions: List[Dict[str, Any]], total_mentions: int = 0) -> Dict[str, Any]:
     """
     Format Slack message payload for negative sentiment alert using Block Kit
@@ -29,15 +114,6 @@ def format_alert_message(negative_percentage: float, top_negative_mentions: List
         # Format timestamp
         current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')
         
-        # Create header block
-        header_block = {
-            "type": "header",
-            "text": {
-                "type": "plain_text",
-                "text": "🚨 Branch Social Listening Alert"
-            }
-        }
-        
         # Create summary block
         summary_text = f"*Negative Sentiment Threshold Exceeded*\n"
         summary_text += f"• Negative Sentiment: *{negative_percentage:.1%}* (≥20% threshold)\n"
@@ -53,10 +129,7 @@ def format_alert_message(negative_percentage: float, top_negative_mentions: List
         }
         
         # Initialize blocks list
-        message_blocks = [header_block, summary_block]
-        
-        # Add divider
-        message_blocks.append({"type": "divider"})
+        message_blocks = [_HEADER_BLOCK, summary_block, _DIVIDER_BLOCK]
         
         # Add top negative mentions
         if top_negative_mentions:
@@ -105,16 +178,7 @@ def format_alert_message(negative_percentage: float, top_negative_mentions: List
                 message_blocks.append(mention_block)
         
         # Add footer
-        footer_block = {
-            "type": "context",
-            "elements": [
-                {
-                    "type": "mrkdwn",
-                    "text": "🤖 Branch Social Listening Scraper | Powered by Hugging Face Sentiment Analysis"
-                }
-            ]
-        }
-        message_blocks.append(footer_block)
+        message_blocks.append(_FOOTER_BLOCK)
         
         # Create complete payload
         payload = {
@@ -135,56 +199,34 @@ def format_alert_message(negative_percentage: float, top_negative_mentions: List
         
         return fallback_payload
 
-def send_slack_alert(negative_percentage: float, top_negative_mentions: List[Dict[str, Any]], webhook_url: str = None, total_mentions: int = 0) -> bool:
+def _do_post(payload: Dict[str, Any], webhook_url: str) -> bool:
     """
-    Send Slack webhook message for negative sentiment alert
+    Deliver a formatted payload to the Slack webhook (runs on the background worker)
     
     Args:
-        negative_percentage: Percentage of negative sentiment
-        top_negative_mentions: Top negative mentions to include in alert
-        webhook_url: Slack webhook URL (defaults to environment variable)
-        total_mentions: Total number of mentions analyzed
+        payload: Slack message payload
+        webhook_url: Slack webhook URL
         
     Returns:
         Boolean indicating success/failure
     """
-    logging.info(f"🔔 Preparing to send Slack alert for {negative_percentage:.1%} negative sentiment")
-    
     try:
-        # Get webhook URL from environment if not provided
-        if not webhook_url:
-            webhook_url = os.getenv('SLACK_WEBHOOK_URL')
-        
-        if not webhook_url:
-            logging.error("❌ No Slack webhook URL provided (check SLACK_WEBHOOK_URL environment variable)")
-            return False
-        
-        # Validate webhook URL format
-        if not webhook_url.startswith('https://hooks.slack.com/'):
-            logging.error(f"❌ Invalid Slack webhook URL format: {webhook_url[:50]}...")
-            return False
-        
-        # Format message payload
-        payload = format_alert_message(negative_percentage, top_negative_mentions, total_mentions)
-        
-        if not payload:
-            logging.error("❌ Failed to format Slack message payload")
-            return False
-        
         # Send webhook request
         logging.info(f"📤 Sending Slack webhook to: {webhook_url[:50]}...")
         
         headers = {
             'Content-Type': 'application/json',
-            'User-Agent': 'Branch-Social-Listening-Scraper/1.0'
+            'User-Agent': 'Branch-Social-Listening-Scraper/1.0',
+            'Connection': 'keep-alive'
         }
         
-        response = requests.post(
-            webhook_url,
-            data=json.dumps(payload),
-            headers=headers,
-            timeout=30
-        )
+        with _post_lock:
+            response = _session.post(
+                webhook_url,
+                data=_dumps(payload),
+                headers=headers,
+                timeout=30
+            )
         
         # Check response status
         if response.status_code == 200:
@@ -215,6 +257,215 @@ def send_slack_alert(negative_percentage: float, top_negative_mentions: List[Dic
         logging.error(f"Traceback: {traceback.format_exc()}")
         return False
 
+def _merge_payloads(payloads: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine several alert payloads into one Block Kit message
+    
+    Args:
+        payloads: Formatted Slack payloads, in arrival order
+        
+    Returns:
+        Single payload containing every alert's blocks separated by dividers
+    """
+    if len(payloads) == 1:
+        return payloads[0]
+    
+    merged_blocks = []
+    fallback_texts = []
+    
+    for payload in payloads:
+        if merged_blocks:
+            merged_blocks.append(_DIVIDER_BLOCK)
+        
+        # Fallback payloads only carry plain text
+        blocks = payload.get('blocks') or [{
+            "type": "section",
+            "text": {"type": "mrkdwn", "text": payload.get('text', '')}
+        }]
+        merged_blocks.extend(blocks)
+        fallback_texts.append(payload.get('text', ''))
+    
+    return {
+        "blocks": merged_blocks,
+        "text": "\n".join(fallback_texts)
+    }
+
+def _flush_loop():
+    """
+    Drain the alert queue, grouping alerts that arrive within the debounce window
+    """
+    stopping = False
+    
+    while not stopping:
+        item = _alert_queue.get()
+        if item is _SHUTDOWN:
+            _alert_queue.task_done()
+            return
+        
+        batch = [item]
+        deadline = time.monotonic() + _BATCH_WINDOW_SECONDS
+        
+        # Collect whatever else arrives before the window closes (or shutdown is requested)
+        while len(batch) < _MAX_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = _alert_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _SHUTDOWN:
+                _alert_queue.task_done()
+                stopping = True
+                break
+            batch.append(item)
+        
+        # Alerts for different webhooks cannot share a message
+        by_webhook = {}
+        for payload, webhook_url, future in batch:
+            by_webhook.setdefault(webhook_url, []).append((payload, future))
+        
+        for webhook_url, items in by_webhook.items():
+            if len(items) > 1:
+                logging.info(f"📦 Grouping {len(items)} Slack alerts into one message")
+            
+            try:
+                success = _do_post(_merge_payloads([payload for payload, _ in items]), webhook_url)
+            except Exception as e:
+                logging.error(f"❌ Unexpected error flushing Slack alerts: {e}")
+                success = False
+            
+            for _, future in items:
+                future.set_result(success)
+        
+        for _ in batch:
+            _alert_queue.task_done()
+
+def _ensure_flush_thread():
+    """
+    Start the background flush worker on first use
+    """
+    global _flush_thread
+    
+    with _flush_thread_lock:
+        if _flush_thread is None or not _flush_thread.is_alive():
+            _flush_thread = threading.Thread(target=_flush_loop, name="slack-alert-flush", daemon=True)
+            _flush_thread.start()
+
+@atexit.register
+def _drain_alert_queue():
+    """
+    Deliver alerts still queued at interpreter exit instead of dropping them with the daemon worker
+    """
+    with _flush_thread_lock:
+        flush_thread = _flush_thread
+    
+    if flush_thread is None or not flush_thread.is_alive():
+        return
+    
+    _alert_queue.put(_SHUTDOWN)
+    flush_thread.join(timeout=_SHUTDOWN_TIMEOUT_SECONDS)
+    
+    if flush_thread.is_alive():
+        logging.warning(f"⚠️ Slack alerts still pending after {_SHUTDOWN_TIMEOUT_SECONDS}s at exit, giving up")
+
+def _build_alert_payload(negative_percentage: float, top_negative_mentions: List[Dict[str, Any]], webhook_url: Optional[str], total_mentions: int):
+    """
+    Resolve the webhook URL and format the alert payload
+    
+    Returns:
+        Tuple of (payload, webhook_url), or (None, None) if the alert cannot be sent
+    """
+    # Get webhook URL from environment if not provided
+    if not webhook_url:
+        webhook_url = os.getenv('SLACK_WEBHOOK_URL')
+    
+    if not webhook_url:
+        logging.error("❌ No Slack webhook URL provided (check SLACK_WEBHOOK_URL environment variable)")
+        return None, None
+    
+    # Validate webhook URL format
+    if not _validate_webhook(webhook_url):
+        logging.error(f"❌ Invalid Slack webhook URL format: {webhook_url[:50]}...")
+        return None, None
+    
+    # Format message payload
+    payload = format_alert_message(negative_percentage, top_negative_mentions, total_mentions)
+    
+    if not payload:
+        logging.error("❌ Failed to format Slack message payload")
+        return None, None
+    
+    return payload, webhook_url
+
+def send_slack_alert_now(negative_percentage: float, top_negative_mentions: List[Dict[str, Any]], webhook_url: str = None, total_mentions: int = 0) -> bool:
+    """
+    Send Slack webhook message for negative sentiment alert, blocking until Slack replies
+    
+    Args:
+        negative_percentage: Percentage of negative sentiment
+        top_negative_mentions: Top negative mentions to include in alert
+        webhook_url: Slack webhook URL (defaults to environment variable)
+        total_mentions: Total number of mentions analyzed
+        
+    Returns:
+        Boolean indicating success/failure
+    """
+    logging.info(f"🔔 Preparing to send Slack alert for {negative_percentage:.1%} negative sentiment")
+    
+    try:
+        payload, webhook_url = _build_alert_payload(negative_percentage, top_negative_mentions, webhook_url, total_mentions)
+        
+        if not payload:
+            return False
+        
+        return _do_post(payload, webhook_url)
+        
+    except Exception as e:
+        logging.error(f"❌ Unexpected error sending Slack alert: {e}")
+        return False
+
+def send_slack_alert(threshold_crossed: bool, negative_percentage: float, top_negative_mentions: List[Dict[str, Any]], webhook_url: str = None, total_mentions: int = 0) -> Future:
+    """
+    Queue a Slack webhook message for negative sentiment alert
+    
+    Takes the tuple returned by calculate_sentiment_threshold as its first
+    three arguments; nothing is formatted or sent when the threshold was not
+    crossed. The payload is built on the calling thread and handed to a
+    background worker, which groups alerts arriving within a short window
+    into a single webhook message. Call `.result(timeout=...)` on the
+    returned Future (e.g. at shutdown) to wait for delivery.
+    
+    Args:
+        threshold_crossed: Whether negative sentiment crossed the alert threshold
+        negative_percentage: Percentage of negative sentiment
+        top_negative_mentions: Top negative mentions to include in alert
+        webhook_url: Slack webhook URL (defaults to environment variable)
+        total_mentions: Total number of mentions analyzed
+        
+    Returns:
+        Future resolving to a boolean indicating success/failure (True when no alert was needed)
+    """
+    if not threshold_crossed:
+        return _completed_future(True)
+    
+    logging.info(f"🔔 Queuing Slack alert for {negative_percentage:.1%} negative sentiment")
+    
+    try:
+        payload, webhook_url = _build_alert_payload(negative_percentage, top_negative_mentions, webhook_url, total_mentions)
+        
+        if not payload:
+            return _completed_future(False)
+        
+        future = Future()
+        _ensure_flush_thread()
+        _alert_queue.put((payload, webhook_url, future))
+        return future
+        
+    except Exception as e:
+        logging.error(f"❌ Unexpected error queuing Slack alert: {e}")
+        return _completed_future(False)
+
 def test_slack_webhook(webhook_url: str = None) -> bool:
     """
     Test Slack webhook connection with a simple message
@@ -252,7 +503,7 @@ def test_slack_webhook(webhook_url: str = None) -> bool:
         
         # Send test request
         headers = {'Content-Type': 'application/json'}
-        response = requests.post(
+        response = _session.post(
             webhook_url,
             data=json.dumps(test_payload),
             headers=headers,
@@ -4,13 +4,84 @@ Uses Hugging Face model (cardiffnlp/twitter-roberta-base-sentiment) via transfor
 Normalizes outputs into 3 classes: positive, neutral, negative
 """
 
+import hashlib
+import heapq
 import logging
+import os
+import shelve
+from collections import Counter
 from typing import List, Dict, Any, Tuple
+import numpy as np
+import torch
 from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
 
 # Global sentiment analyzer instance (lazy loading)
 _sentiment_analyzer = None
 
+# Map cardiffnlp model labels (both cases) to standard format
+_LABEL_MAP = {
+    'LABEL_0': 'negative', 'label_0': 'negative', 'negative': 'negative', 'NEGATIVE': 'negative',
+    'LABEL_1': 'neutral', 'label_1': 'neutral', 'neutral': 'neutral', 'NEUTRAL': 'neutral',
+    'LABEL_2': 'positive', 'label_2': 'positive', 'positive': 'positive', 'POSITIVE': 'positive'
+}
+
+# Number of texts the pipeline stacks into one padded tensor per forward pass
+SENTIMENT_BATCH_SIZE = 32
+
+# Longer inputs are truncated by the tokenizer (in tokens, not characters)
+SENTIMENT_MAX_LENGTH = 256
+
+MODEL_NAME = "cardiffnlp/twitter-roberta-base-sentiment"
+
+def _has_model_weights(model_dir: str) -> bool:
+    """
+    Check whether a local model directory holds a config and weights
+    """
+    if not os.path.isfile(os.path.join(model_dir, 'config.json')):
+        return False
+    return any(f.endswith('.safetensors') or f == 'pytorch_model.bin' for f in os.listdir(model_dir))
+
+def ensure_local_model(model_name: str = MODEL_NAME, model_dir: str = None) -> str:
+    """
+    Download model files into a local directory on first use
+    
+    Later runs load straight from disk with no Hugging Face Hub round trip.
+    safetensors weights are preferred (memory-mapped on load); the pickle
+    checkpoint is only fetched if the repo has no safetensors file.
+    
+    Args:
+        model_name: Hugging Face Hub model ID
+        model_dir: Local directory (defaults to SENTIMENT_MODEL_DIR environment variable)
+        
+    Returns:
+        Path to the local model directory
+    """
+    if not model_dir:
+        model_dir = os.getenv('SENTIMENT_MODEL_DIR', os.path.join('models', model_name.replace('/', '--')))
+    
+    if _has_model_weights(model_dir):
+        return model_dir
+    
+    from huggingface_hub import snapshot_download, hf_hub_download
+    
+    logging.info(f"📥 Downloading {model_name} to {model_dir}")
+    snapshot_download(
+        model_name,
+        local_dir=model_dir,
+        allow_patterns=['*.json', '*.safetensors', '*.txt', '*.model']
+    )
+    
+    if not _has_model_weights(model_dir):
+        hf_hub_download(model_name, 'pytorch_model.bin', local_dir=model_dir)
+    
+    return model_dir
+
+def _quantization_enabled() -> bool:
+    """
+    Whether the model is dynamically quantized to int8 (CPU only; opt out with SENTIMENT_QUANTIZE=0)
+    """
+    return not torch.cuda.is_available() and os.getenv('SENTIMENT_QUANTIZE', '1') != '0'
+
 def get_sentiment_analyzer():
     """
     Get or create sentiment analysis pipeline using cardiffnlp/twitter-roberta-base-sentiment
@@ -18,22 +89,37 @@ def get_sentiment_analyzer():
     global _sentiment_analyzer
     
     if _sentiment_analyzer is None:
-        logging.info("Loading Hugging Face sentiment analysis model: cardiffnlp/twitter-roberta-base-sentiment")
+        logging.info(f"Loading Hugging Face sentiment analysis model: {MODEL_NAME}")
         
         try:
-            # Initialize the sentiment analysis pipeline
-            model_name = "cardiffnlp/twitter-roberta-base-sentiment"
+            # Initialize the sentiment analysis pipeline from the local copy
+            model_dir = ensure_local_model()
             
             # Load model and tokenizer
-            tokenizer = AutoTokenizer.from_pretrained(model_name)
-            model = AutoModelForSequenceClassification.from_pretrained(model_name)
+            tokenizer = AutoTokenizer.from_pretrained(model_dir, local_files_only=True, use_fast=True)
+            model = AutoModelForSequenceClassification.from_pretrained(
+                model_dir,
+                local_files_only=True,
+                torch_dtype=torch.float32
+            )
             
-            # Create pipeline
+            # Dynamic int8 quantization of the Linear layers
+            use_cuda = torch.cuda.is_available()
+            if _quantization_enabled():
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+                logging.info("⚡ Applied dynamic int8 quantization to sentiment model")
+            
+            # Create pipeline (top_k=None returns scores for every label);
+            # the pipeline batches inputs itself, padding each batch to its longest text
             _sentiment_analyzer = pipeline(
                 "sentiment-analysis",
                 model=model,
                 tokenizer=tokenizer,
-                return_all_scores=True
+                device=0 if use_cuda else -1,
+                batch_size=SENTIMENT_BATCH_SIZE,
+                truncation=True,
+                max_length=SENTIMENT_MAX_LENGTH,
+                top_k=None
             )
             
             logging.info("✅ Sentiment analysis model loaded successfully")
@@ -54,24 +140,26 @@ def normalize_sentiment_label(label: str) -> str:
     Returns:
         Normalized label: 'positive', 'neutral', or 'negative'
     """
-    label_lower = label.lower()
+    normalized = _LABEL_MAP.get(label)
+    if normalized is not None:
+        return normalized
+    
+    # Slow path for unusual casing
+    normalized = _LABEL_MAP.get(label.lower())
+    if normalized is not None:
+        return normalized
     
-    # Map cardiffnlp model labels to standard format
-    if label_lower in ['label_2', 'positive']:
-        return 'positive'
-    elif label_lower in ['label_1', 'neutral']:
-        return 'neutral'
-    elif label_lower in ['label_0', 'negative']:
-        return 'negative'
-    else:
-        # Default to neutral for unknown labels
-        logging.warning(f"Unknown sentiment label: {label}, defaulting to neutral")
-        return 'neutral'
+    # Default to neutral for unknown labels
+    logging.warning(f"Unknown sentiment label: {label}, defaulting to neutral")
+    return 'neutral'
 
 def clean_text_for_sentiment(text: str) -> str:
     """
     Clean text for better sentiment analysis
     
+    Encoding and length are handled by the fast tokenizer, which truncates
+    to SENTIMENT_MAX_LENGTH tokens.
+    
     Args:
         text: Raw text string
         
@@ -81,32 +169,21 @@ def clean_text_for_sentiment(text: str) -> str:
     if not text or not isinstance(text, str):
         return ""
     
-    # Basic text cleaning
-    cleaned = text.strip()
-    
-    # Handle encoding issues
-    try:
-        cleaned = cleaned.encode('utf-8', errors='ignore').decode('utf-8')
-    except Exception:
-        pass
-    
-    # Truncate very long texts (model has token limits)
-    if len(cleaned) > 500:
-        cleaned = cleaned[:500] + "..."
-        
-    return cleaned
+    return text.strip()
 
-def analyze_sentiment(texts: List[str]) -> List[Dict[str, Any]]:
+def analyze_sentiment(texts: List[str], batch_size: int = SENTIMENT_BATCH_SIZE, max_length: int = SENTIMENT_MAX_LENGTH) -> List[Dict[str, Any]]:
     """
     Analyze sentiment of text list using Hugging Face transformers
     
     Args:
         texts: List of text strings to analyze
+        batch_size: Number of texts per padded forward pass
+        max_length: Maximum tokens per text; longer texts are truncated
         
     Returns:
         List of dictionaries with sentiment labels and scores
     """
-    logging.info(f"Starting sentiment analysis for {len(texts)} texts")
+    logging.debug(f"Starting sentiment analysis for {len(texts)} texts")
     
     if not texts:
         logging.warning("No texts provided for sentiment analysis")
@@ -129,42 +206,50 @@ def analyze_sentiment(texts: List[str]) -> List[Dict[str, Any]]:
             return [{'sentiment_label': 'neutral', 'sentiment_score': 0.5, 'error': 'empty_text'} for _ in texts]
         
         # Run sentiment analysis on valid texts
-        logging.info(f"Analyzing sentiment for {len(valid_texts)} valid texts")
+        logging.debug(f"Analyzing sentiment for {len(valid_texts)} valid texts")
+        
+        # Bucket by length so each padded batch holds texts of similar size (fewer pad tokens);
+        # results are mapped back through the original indices
+        valid_texts.sort(key=lambda item: len(item[1]))
         
-        # Process texts in batches to avoid memory issues
-        batch_size = 10
+        # Feed every text to the pipeline at once; it batches internally
+        batch_texts = [item[1] for item in valid_texts]
         analyzed_results = {}
         
-        for i in range(0, len(valid_texts), batch_size):
-            batch = valid_texts[i:i+batch_size]
-            batch_texts = [item[1] for item in batch]
+        try:
+            with torch.inference_mode():
+                predictions = analyzer(batch_texts, batch_size=batch_size, truncation=True, max_length=max_length)
             
-            try:
-                # Run analysis on batch
-                predictions = analyzer(batch_texts)
+            # Store results with original indices
+            for (original_idx, _), pred_scores in zip(valid_texts, predictions):
+                # Normalize every score and find the best prediction in one pass
+                best_label = 'neutral'
+                best_score = -1.0
+                all_scores = {}
+                
+                for pred in pred_scores:
+                    label = _LABEL_MAP.get(pred['label']) or normalize_sentiment_label(pred['label'])
+                    score = pred['score']
+                    all_scores[label] = score
+                    if score > best_score:
+                        best_label = label
+                        best_score = score
                 
-                # Store results with original indices
-                for j, (original_idx, _) in enumerate(batch):
-                    pred_scores = predictions[j]
-                    
-                    # Find best prediction
-                    best_pred = max(pred_scores, key=lambda x: x['score'])
-                    
-                    analyzed_results[original_idx] = {
-                        'sentiment_label': normalize_sentiment_label(best_pred['label']),
-                        'sentiment_score': round(best_pred['score'], 4),
-                        'all_scores': {normalize_sentiment_label(p['label']): round(p['score'], 4) for p in pred_scores}
-                    }
-                    
-            except Exception as e:
-                logging.error(f"Error analyzing batch {i//batch_size + 1}: {e}")
-                # Fill with neutral results for this batch
-                for original_idx, _ in batch:
-                    analyzed_results[original_idx] = {
-                        'sentiment_label': 'neutral',
-                        'sentiment_score': 0.5,
-                        'error': f'analysis_failed: {str(e)}'
-                    }
+                analyzed_results[original_idx] = {
+                    'sentiment_label': best_label,
+                    'sentiment_score': best_score,
+                    'all_scores': all_scores
+                }
+                
+        except Exception as e:
+            logging.error(f"Error analyzing texts: {e}")
+            # Fill with neutral results
+            for original_idx, _ in valid_texts:
+                analyzed_results[original_idx] = {
+                    'sentiment_label': 'neutral',
+                    'sentiment_score': 0.5,
+                    'error': f'analysis_failed: {str(e)}'
+                }
         
         # Create results list in original order
         for i, text in enumerate(texts):
@@ -181,12 +266,9 @@ def analyze_sentiment(texts: List[str]) -> List[Dict[str, Any]]:
         logging.info(f"✅ Sentiment analysis completed for {len(results)} texts")
         
         # Log sentiment distribution
-        sentiment_counts = {}
-        for result in results:
-            label = result['sentiment_label']
-            sentiment_counts[label] = sentiment_counts.get(label, 0) + 1
+        sentiment_counts = Counter(result['sentiment_label'] for result in results)
         
-        logging.info(f"📊 Sentiment distribution: {sentiment_counts}")
+        logging.info(f"📊 Sentiment distribution: {dict(sentiment_counts)}")
         
         return results
         
@@ -195,6 +277,65 @@ def analyze_sentiment(texts: List[str]) -> List[Dict[str, Any]]:
         # Return neutral results as fallback
         return [{'sentiment_label': 'neutral', 'sentiment_score': 0.5, 'error': f'failed: {str(e)}'} for _ in texts]
 
+def _sentiment_cache_scope(max_length: int) -> str:
+    """
+    Settings that change a text's scores: the model, whether it is quantized and the truncation length
+    """
+    return f"{MODEL_NAME}\0quantized={_quantization_enabled()}\0max_length={max_length}"
+
+def _sentiment_cache_key(scope: str, text: str) -> str:
+    """
+    Cache key for a text's sentiment result, scoped to the settings that produced it
+    """
+    return hashlib.blake2b(f"{scope}\0{text}".encode('utf-8'), digest_size=16).hexdigest()
+
+def analyze_sentiment_cached(texts: List[str], cache_path: str = None, **kwargs) -> List[Dict[str, Any]]:
+    """
+    Analyze sentiment, reusing results persisted from previous runs
+    
+    Results are stored in a shelve database keyed by a hash of each text and
+    the settings that affect its scores (model, quantization, max_length);
+    only texts without a cached result are sent to the model. Failed
+    analyses are not cached.
+    
+    Args:
+        texts: List of text strings to analyze
+        cache_path: Shelve database path (defaults to SENTIMENT_CACHE_PATH environment variable)
+        **kwargs: Passed through to analyze_sentiment
+        
+    Returns:
+        List of dictionaries with sentiment labels and scores, in input order
+    """
+    if not texts:
+        return analyze_sentiment(texts, **kwargs)
+    
+    if not cache_path:
+        cache_path = os.getenv('SENTIMENT_CACHE_PATH', 'sentiment_cache')
+    
+    try:
+        cache = shelve.open(cache_path)
+    except Exception as e:
+        logging.warning(f"⚠️ Sentiment cache unavailable ({e}), analyzing without it")
+        return analyze_sentiment(texts, **kwargs)
+    
+    with cache:
+        scope = _sentiment_cache_scope(kwargs.get('max_length', SENTIMENT_MAX_LENGTH))
+        keys = [_sentiment_cache_key(scope, text) for text in texts]
+        results = [cache.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        
+        logging.info(f"🗃️ Sentiment cache: {len(texts) - len(missing)} hits, {len(missing)} misses")
+        
+        if missing:
+            fresh_results = analyze_sentiment([texts[i] for i in missing], **kwargs)
+            
+            for i, result in zip(missing, fresh_results):
+                results[i] = result
+                if 'error' not in result:
+                    cache[keys[i]] = result
+    
+    return results
+
 def calculate_sentiment_threshold(sentiment_results: List[Dict[str, Any]], threshold: float = 0.20) -> Tuple[bool, float, List[Dict[str, Any]]]:
     """
     Calculate if negative sentiment crosses threshold and return top negative mentions
@@ -206,35 +347,32 @@ def calculate_sentiment_threshold(sentiment_results: List[Dict[str, Any]], thres
     Returns:
         Tuple of (threshold_crossed, negative_percentage, top_negative_mentions)
     """
-    logging.info(f"🎯 Calculating sentiment threshold with {len(sentiment_results)} mentions (threshold: {threshold:.1%})")
+    logging.debug(f"🎯 Calculating sentiment threshold with {len(sentiment_results)} mentions (threshold: {threshold:.1%})")
     
     if not sentiment_results:
         logging.warning("No sentiment results provided for threshold calculation")
         return False, 0.0, []
     
     try:
-        # Count negative mentions and total valid mentions
-        negative_mentions = []
-        total_mentions = 0
+        # Extract labels and scores once; missing scores become NaN
+        labels = np.array([str(mention.get('sentiment_label') or '').lower() for mention in sentiment_results])
+        scores = np.array([
+            np.nan if mention.get('sentiment_score') is None else mention.get('sentiment_score')
+            for mention in sentiment_results
+        ], dtype=np.float64)
         
-        for mention in sentiment_results:
-            # Skip mentions without proper sentiment analysis
-            sentiment_label = mention.get('sentiment_label')
-            sentiment_score = mention.get('sentiment_score')
-            
-            if sentiment_label and sentiment_score is not None:
-                total_mentions += 1
-                
-                # Collect negative mentions
-                if sentiment_label.lower() == 'negative':
-                    negative_mentions.append(mention)
+        # Skip mentions without proper sentiment analysis
+        valid_mask = (labels != '') & ~np.isnan(scores)
+        negative_mask = valid_mask & (labels == 'negative')
+        
+        total_mentions = int(valid_mask.sum())
         
         if total_mentions == 0:
             logging.warning("No valid sentiment results found for threshold calculation")
             return False, 0.0, []
         
         # Calculate negative sentiment percentage
-        negative_count = len(negative_mentions)
+        negative_count = int(negative_mask.sum())
         negative_percentage = negative_count / total_mentions
         
         logging.info(f"📊 Sentiment analysis: {negative_count}/{total_mentions} negative ({negative_percentage:.1%})")
@@ -245,17 +383,15 @@ def calculate_sentiment_threshold(sentiment_results: List[Dict[str, Any]], thres
         if threshold_crossed:
             logging.warning(f"🚨 Negative sentiment threshold crossed: {negative_percentage:.1%} ≥ {threshold:.1%}")
             
-            # Sort negative mentions by sentiment score (most negative first)
-            sorted_negative = sorted(
-                negative_mentions,
-                key=lambda x: x.get('sentiment_score', 0.0),  # Lower score = more negative
-                reverse=False  # Sort ascending (most negative first)
-            )
+            # Pick the 3 lowest sentiment scores (lower score = more negative) without a full sort;
+            # nsmallest keeps ties in their original order
+            negative_indices = np.flatnonzero(negative_mask).tolist()
+            top_indices = heapq.nsmallest(3, negative_indices, key=scores.__getitem__)
             
             # Get top 3 negative mentions
-            top_negative_mentions = sorted_negative[:3]
+            top_negative_mentions = [sentiment_results[i] for i in top_indices]
             
-            logging.info(f"📋 Selected {len(top_negative_mentions)} top negative mentions for alert")
+            logging.debug(f"📋 Selected {len(top_negative_mentions)} top negative mentions for alert")
             
         else:
             logging.info(f"✅ Negative sentiment below threshold: {negative_percentage:.1%} < {threshold:.1%}")
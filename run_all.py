@@ -10,80 +10,146 @@ Demo Success Criteria:
 - Triggers Slack alert if ≥20% negative sentiment
 """
 
+import asyncio
 import logging
+import logging.handlers
 import sys
 import os
 from datetime import datetime
 from typing import List, Dict, Any
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('branch_scraper.log')
-    ]
-)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    import json
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
-def main():
+# Upper bound on scrapers fetching at once (override with SCRAPER_CONCURRENCY)
+DEFAULT_SCRAPER_CONCURRENCY = 20
+
+def write_json(path: str, data: Dict[str, Any]):
+    """
+    Write pipeline output as indented UTF-8 JSON, using orjson when available
+    """
+    if ORJSON_AVAILABLE:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+def write_jsonl(path: str, records: List[Dict[str, Any]]):
+    """
+    Write records as newline-delimited JSON, one compact object per line
+    """
+    if ORJSON_AVAILABLE:
+        with open(path, 'wb') as f:
+            for record in records:
+                f.write(orjson.dumps(record, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False))
+                f.write('\n')
+
+def configure_logging():
+    """
+    Configure console and file logging for a pipeline run
+    
+    File output is buffered in memory and written in batches; errors flush
+    the buffer immediately, and logging.shutdown() drains it at exit.
+    """
+    log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    
+    # The buffered records are formatted by the target, so it needs its own formatter
+    log_file = logging.FileHandler('branch_scraper.log')
+    log_file.setFormatter(logging.Formatter(log_format))
+    
+    file_handler = logging.handlers.MemoryHandler(
+        capacity=1024,
+        flushLevel=logging.ERROR,
+        target=log_file
+    )
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format=log_format,
+        handlers=[
+            logging.StreamHandler(sys.stdout),
+            file_handler
+        ]
+    )
+
+def get_scraper_concurrency() -> int:
+    """
+    Read SCRAPER_CONCURRENCY, falling back to the default when it is empty, malformed or below 1
+    """
+    value = os.getenv('SCRAPER_CONCURRENCY', '')
+    try:
+        concurrency = int(value)
+    except ValueError:
+        if value:
+            logger.warning(f"Invalid SCRAPER_CONCURRENCY '{value}', using {DEFAULT_SCRAPER_CONCURRENCY}")
+        return DEFAULT_SCRAPER_CONCURRENCY
+    
+    if concurrency < 1:
+        logger.warning(f"SCRAPER_CONCURRENCY must be at least 1, using {DEFAULT_SCRAPER_CONCURRENCY}")
+        return DEFAULT_SCRAPER_CONCURRENCY
+    
+    return concurrency
+
+async def main():
     """
     Main execution function for Branch Social Listening Scraper MVP
     """
+    configure_logging()
     logger.info("=== Branch Social Listening Scraper MVP Started ===")
     start_time = datetime.now()
     
     try:
         # Import scrapers (inside function to avoid import errors during initialization)
+        from scrapers._util import run_in_thread
         from scrapers.twitter import scrape_twitter_mentions
         from scrapers.facebook import scrape_facebook_mentions
         from scrapers.google_play import scrape_google_play_reviews
-        from scrapers.data_processor import deduplicate_mentions, get_mentions_summary, sort_mentions_by_timestamp
+        from scrapers.data_processor import process_mentions
         
         # Stage 2: Data collection from all sources
         logger.info("Stage 2: Starting data collection from all sources")
         
         all_mentions = []
         
-        # Twitter scraping
-        logger.info("Collecting Twitter mentions...")
-        try:
-            twitter_query = os.getenv('TWITTER_QUERY', 'Branch OR @BranchApp')
-            tweets = scrape_twitter_mentions(query=twitter_query, limit=50)
-            all_mentions.extend(tweets)
-            logger.info(f"✅ Collected {len(tweets)} Twitter mentions")
-        except Exception as e:
-            logger.error(f"Twitter scraping failed: {e}")
+        twitter_query = os.getenv('TWITTER_QUERY', 'Branch OR @BranchApp')
+        facebook_page = os.getenv('FACEBOOK_PAGE', 'Branch')
+        google_play_app_id = os.getenv('GOOGLE_PLAY_APP_ID', 'io.branch.referral.branch')
+        
+        # Scrapers are independent and network-bound, so run them concurrently under a shared limit
+        scrape_limiter = asyncio.BoundedSemaphore(get_scraper_concurrency())
         
-        # Facebook scraping
-        logger.info("Collecting Facebook mentions...")
-        try:
-            facebook_page = os.getenv('FACEBOOK_PAGE', 'Branch')
-            posts = scrape_facebook_mentions(page_name=facebook_page, limit=10)
-            all_mentions.extend(posts)
-            logger.info(f"✅ Collected {len(posts)} Facebook mentions")
-        except Exception as e:
-            logger.error(f"Facebook scraping failed: {e}")
+        logger.info("Collecting Twitter mentions, Facebook mentions and Google Play reviews...")
+        sources = [('Twitter', 'mentions'), ('Facebook', 'mentions'), ('Google Play', 'reviews')]
+        results = await asyncio.gather(
+            run_in_thread(scrape_twitter_mentions, query=twitter_query, limit=50, semaphore=scrape_limiter),
+            run_in_thread(scrape_facebook_mentions, page_name=facebook_page, limit=10, semaphore=scrape_limiter),
+            run_in_thread(scrape_google_play_reviews, app_id=google_play_app_id, limit=25, semaphore=scrape_limiter),
+            return_exceptions=True
+        )
         
-        # Google Play scraping
-        logger.info("Collecting Google Play reviews...")
-        try:
-            google_play_app_id = os.getenv('GOOGLE_PLAY_APP_ID', 'io.branch.referral.branch')
-            reviews = scrape_google_play_reviews(app_id=google_play_app_id, limit=25)
-            all_mentions.extend(reviews)
-            logger.info(f"✅ Collected {len(reviews)} Google Play reviews")
-        except Exception as e:
-            logger.error(f"Google Play scraping failed: {e}")
+        for (source_name, item_label), result in zip(sources, results):
+            if isinstance(result, Exception):
+                logger.error(f"{source_name} scraping failed: {result}")
+            else:
+                all_mentions.extend(result)
+                logger.info(f"✅ Collected {len(result)} {source_name} {item_label}")
         
         # Data processing and deduplication
         logger.info(f"Processing {len(all_mentions)} total mentions...")
-        deduplicated_mentions = deduplicate_mentions(all_mentions)
-        sorted_mentions = sort_mentions_by_timestamp(deduplicated_mentions)
+        sorted_mentions, summary = process_mentions(all_mentions)
         
-        # Generate summary
-        summary = get_mentions_summary(sorted_mentions)
+        # Log summary
         logger.info(f"📊 Collection Summary:")
         logger.info(f"   Total mentions: {summary['total_mentions']}")
         logger.info(f"   By source: {summary['by_source']}")
@@ -92,13 +158,11 @@ def main():
         
         # Save results for Stage 3 processing
         logger.info("💾 Saving collected mentions for sentiment analysis...")
-        import json
-        with open('collected_mentions.json', 'w', encoding='utf-8') as f:
-            json.dump({
-                'mentions': sorted_mentions,
-                'summary': summary,
-                'collection_timestamp': datetime.now().isoformat()
-            }, f, indent=2, ensure_ascii=False)
+        write_jsonl('collected_mentions.jsonl', sorted_mentions)
+        write_json('collected_summary.json', {
+            'summary': summary,
+            'collection_timestamp': datetime.now().isoformat()
+        })
         
         logger.info("Stage 2 Complete: Data collection and processing finished")
         
@@ -115,15 +179,9 @@ def main():
         # Exit successfully
         return 0
         
-        # Exit successfully
-        return 0
-        
     except Exception as e:
-        logger.error(f"Pipeline failed with error: {e}")
-        logger.error(f"Error type: {type(e).__name__}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.exception(f"Pipeline failed with error: {e} ({type(e).__name__})")
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+"""
+Branch Social Listening Scraper - Shared Scraper Utilities
+Text, validation and concurrency helpers used by every source scraper
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+
+# Fields every scraped record must carry with a non-empty value
+REQUIRED_FIELDS = frozenset({'source', 'id', 'user', 'text', 'timestamp'})
+
+@lru_cache(maxsize=1024)
+def clean_text(text: str) -> str:
+    """
+    Clean and normalize scraped post/review/tweet text
+    
+    Pure function of its argument, so results are memoized; repeated texts
+    (and every simulated record after the first pass) are cache hits.
+    
+    Args:
+        text: Raw text
+    
+    Returns:
+        Cleaned text
+    """
+    if not text:
+        return ""
+    
+    # Drop lone surrogates (e.g. half of a truncated emoji) that cannot be encoded as UTF-8
+    # and would make the JSON writers fail; done first so no whitespace gap is left behind
+    text = text.encode('utf-8', errors='ignore').decode('utf-8')
+    
+    # Collapse whitespace runs; str.split() outperforms a compiled \s+ regex here
+    return " ".join(text.split())
+
+def validate_record(record: Dict[str, Any]) -> bool:
+    """
+    Validate that a scraped record has every required field with a non-empty value
+    
+    Args:
+        record: Unified-format record dictionary
+        
+    Returns:
+        True if valid, False otherwise
+    """
+    return REQUIRED_FIELDS <= record.keys() and all(record[field] for field in REQUIRED_FIELDS)
+
+def simulated_timestamps(rng: np.random.Generator, n: int, max_days: int, now_ts: Optional[float] = None) -> List[str]:
+    """
+    Draw ISO timestamps for simulated records, each a random whole number of days and hours in the past
+    
+    Args:
+        rng: Random generator shared with the caller's other draws
+        n: Number of timestamps
+        max_days: Exclusive upper bound on the age in days
+        now_ts: Reference epoch seconds (defaults to the current time)
+        
+    Returns:
+        List of n ISO 8601 timestamps
+    """
+    if now_ts is None:
+        now_ts = time.time()
+    
+    # Ages are drawn in one vectorized call (upper bounds are exclusive), then formatted from epoch seconds
+    age_seconds = (rng.integers(0, max_days, size=n) * 86400 + rng.integers(0, 24, size=n) * 3600).tolist()
+    to_datetime = datetime.fromtimestamp
+    return [to_datetime(now_ts - age).isoformat() for age in age_seconds]
+
+async def run_in_thread(fn: Callable[..., Any], *args, semaphore: Optional[asyncio.Semaphore] = None, **kwargs) -> Any:
+    """
+    Run a blocking scraper in a worker thread so it can overlap with other sources
+    
+    Args:
+        fn: Synchronous scraper function
+        *args, **kwargs: Passed through to fn
+        semaphore: Optional semaphore shared across scrapers to bound concurrent fetches
+        
+    Returns:
+        Whatever fn returns
+    """
+    if semaphore is None:
+        return await asyncio.to_thread(fn, *args, **kwargs)
+    async with semaphore:
+        return await asyncio.to_thread(fn, *args, **kwargs)
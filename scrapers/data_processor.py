@@ -3,101 +3,220 @@ Branch Social Listening Scraper - Data Processing Module
 Handles deduplication, validation, and unified data formatting across all sources
 """
 
+import functools
 import logging
-from typing import List, Dict, Any, Set
+import re
+import sys
+from collections import Counter
+from typing import Iterator, List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import hashlib
 
-def deduplicate_mentions(all_mentions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# Python 3.11+ parses a trailing 'Z' natively; older versions need it rewritten first
+if sys.version_info >= (3, 11):
+    parse_iso_timestamp = datetime.fromisoformat
+else:
+    def parse_iso_timestamp(timestamp: str) -> datetime:
+        """
+        Parse an ISO 8601 timestamp, accepting a trailing 'Z' for UTC
+        """
+        if timestamp.endswith('Z'):
+            timestamp = timestamp[:-1] + '+00:00'
+        return datetime.fromisoformat(timestamp)
+
+# Branch-related terms used by filter_mentions_by_relevance when no keywords are given
+DEFAULT_RELEVANCE_KEYWORDS = (
+    'branch', '@branchapp', 'branch.io', 'deep link', 'deeplink',
+    'attribution', 'mobile link', 'app link', 'branch sdk',
+    'branch metrics', 'branch analytics'
+)
+
+# Required fields and accepted sources for the unified mention format
+_REQUIRED_FIELDS = ('source', 'id', 'user', 'text', 'timestamp')
+_VALID_SOURCES = frozenset({'twitter', 'facebook', 'google_play'})
+
+@functools.lru_cache(maxsize=16)
+def _compile_keywords(keywords: Tuple[str, ...]) -> Optional[re.Pattern]:
     """
-    Remove duplicate mentions across all sources using multiple deduplication strategies
+    Compile keywords into one case-insensitive alternation so matching runs in C
+    """
+    if not keywords:
+        return None
+    return re.compile('|'.join(re.escape(keyword.lower()) for keyword in keywords))
+
+def _content_hash(data: bytes) -> int:
+    """
+    Fast non-cryptographic 64-bit hash of text content for deduplication
+    """
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_64_intdigest(data)
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+def _iter_unique_mentions(all_mentions: List[Dict[str, Any]]) -> Iterator[Tuple[float, Dict[str, Any]]]:
+    """
+    Yield valid, unique mentions in input order, logging dedup statistics when exhausted
     
     Args:
         all_mentions: List of mentions from all sources
         
-    Returns:
-        Deduplicated list of mentions
+    Yields:
+        (timestamp epoch, mention) for mentions that passed deduplication and validation;
+        the epoch parsed during validation is handed back so callers need not re-parse it
     """
     logging.info(f"Starting deduplication of {len(all_mentions)} total mentions")
     
     seen_ids = set()
     seen_content_hashes = set()
-    deduplicated = []
+    unique_count = 0
     
     duplicates_by_id = 0
     duplicates_by_content = 0
     
+    # Bind hot-loop lookups to locals once instead of resolving them per mention
+    id_seen = seen_ids.__contains__
+    add_id = seen_ids.add
+    hash_seen = seen_content_hashes.__contains__
+    add_hash = seen_content_hashes.add
+    content_hash_of = _content_hash
+    validated_epoch = _validated_epoch
+    
     for mention in all_mentions:
-        # Strategy 1: Deduplication by ID
-        mention_id = f"{mention.get('source', '')}_{mention.get('id', '')}"
-        if mention_id in seen_ids:
+        get = mention.get
+        
+        # Strategy 1: Deduplication by ID (tuple key avoids building a string per mention)
+        mention_id = (get('source', ''), get('id', ''))
+        if id_seen(mention_id):
             duplicates_by_id += 1
             continue
             
-        seen_ids.add(mention_id)
+        add_id(mention_id)
         
         # Strategy 2: Deduplication by content hash (similar text content)
-        text_content = mention.get('text', '').strip().lower()
+        text_content = get('text', '').strip().lower()
         if text_content:
-            content_hash = hashlib.md5(text_content.encode('utf-8')).hexdigest()
-            if content_hash in seen_content_hashes:
+            content_hash = content_hash_of(text_content.encode('utf-8'))
+            if hash_seen(content_hash):
                 duplicates_by_content += 1
                 continue
-            seen_content_hashes.add(content_hash)
+            add_hash(content_hash)
         
         # Validate mention has required fields
-        if validate_mention_data(mention):
-            deduplicated.append(mention)
+        epoch = validated_epoch(mention)
+        if epoch is not None:
+            unique_count += 1
+            yield epoch, mention
         else:
-            logging.warning(f"Skipping invalid mention: {mention_id}")
+            logging.warning(f"Skipping invalid mention: {mention_id[0]}_{mention_id[1]}")
     
-    logging.info(f"Deduplication complete: {len(deduplicated)} unique mentions")
+    logging.info(f"Deduplication complete: {unique_count} unique mentions")
     logging.info(f"Removed {duplicates_by_id} duplicates by ID, {duplicates_by_content} by content")
+
+def deduplicate_mentions(all_mentions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Remove duplicate mentions across all sources using multiple deduplication strategies
     
-    return deduplicated
+    Args:
+        all_mentions: List of mentions from all sources
+        
+    Returns:
+        Deduplicated list of mentions
+    """
+    return [mention for _, mention in _iter_unique_mentions(all_mentions)]
 
-def validate_mention_data(mention: Dict[str, Any]) -> bool:
+def process_mentions(all_mentions: List[Dict[str, Any]], reverse: bool = True) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
     """
-    Validate that mention data has all required fields and proper format
+    Deduplicate, validate, sort and summarize mentions
+    
+    Equivalent to deduplicate_mentions -> sort_mentions_by_timestamp ->
+    get_mentions_summary, but each timestamp is parsed only once, during
+    validation, and reused for both the sort and the summary.
+    
+    Args:
+        all_mentions: List of mentions from all sources
+        reverse: If True, sort newest first (default), if False, oldest first
+        
+    Returns:
+        Tuple of (sorted_unique_mentions, summary)
+    """
+    keyed_mentions = list(_iter_unique_mentions(all_mentions))
+    summary = _summarize_keyed_mentions(keyed_mentions)
+    
+    keyed_mentions.sort(key=lambda pair: pair[0], reverse=reverse)
+    sorted_mentions = [mention for _, mention in keyed_mentions]
+    logging.info(f"Sorted {len(sorted_mentions)} mentions by timestamp ({'newest' if reverse else 'oldest'} first)")
+    
+    return sorted_mentions, summary
+
+def _timestamp_epoch(mention: Dict[str, Any]) -> Optional[float]:
+    """
+    Return the mention's timestamp as epoch seconds
+    
+    Naive timestamps are interpreted as local time, so naive and offset-aware
+    timestamps can be ordered together. The mention itself is never modified.
     
     Args:
         mention: Single mention data dictionary
         
     Returns:
-        True if valid, False otherwise
+        Epoch seconds, or None if the timestamp is missing or malformed
+    """
+    try:
+        return parse_iso_timestamp(mention['timestamp']).timestamp()
+    except (KeyError, ValueError, TypeError, AttributeError):
+        return None
+
+def _validated_epoch(mention: Dict[str, Any]) -> Optional[float]:
     """
-    # Required fields for unified format
-    required_fields = ['source', 'id', 'user', 'text', 'timestamp']
+    Validate a mention and return its timestamp as epoch seconds
     
+    Returns:
+        Epoch seconds if the mention is valid, None otherwise
+    """
     # Check all required fields exist and are not empty
-    for field in required_fields:
-        if field not in mention or not mention[field]:
+    for field in _REQUIRED_FIELDS:
+        if not mention.get(field):
             logging.debug(f"Missing or empty required field '{field}' in mention")
-            return False
+            return None
     
     # Validate source is one of expected values
-    valid_sources = ['twitter', 'facebook', 'google_play']
-    if mention['source'] not in valid_sources:
-        logging.debug(f"Invalid source '{mention['source']}', expected one of {valid_sources}")
-        return False
+    if mention['source'] not in _VALID_SOURCES:
+        logging.debug(f"Invalid source '{mention['source']}', expected one of {sorted(_VALID_SOURCES)}")
+        return None
     
-    # Validate timestamp format (basic check)
-    try:
-        datetime.fromisoformat(mention['timestamp'].replace('Z', '+00:00'))
-    except (ValueError, AttributeError):
+    # Validate timestamp format (basic check); the parsed value is returned for sorting
+    epoch = _timestamp_epoch(mention)
+    if epoch is None:
         logging.debug(f"Invalid timestamp format: {mention.get('timestamp', 'None')}")
-        return False
+        return None
     
     # Validate text content is not too short or too long
     text_length = len(mention['text'].strip())
     if text_length < 10:  # Too short to be meaningful
         logging.debug(f"Text content too short: {text_length} characters")
-        return False
+        return None
     if text_length > 5000:  # Suspiciously long
         logging.debug(f"Text content too long: {text_length} characters")
-        return False
+        return None
     
-    return True
+    return epoch
+
+def validate_mention_data(mention: Dict[str, Any]) -> bool:
+    """
+    Validate that mention data has all required fields and proper format
+    
+    Args:
+        mention: Single mention data dictionary
+        
+    Returns:
+        True if valid, False otherwise
+    """
+    return _validated_epoch(mention) is not None
 
 def create_unified_format(source: str, raw_data: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -150,29 +269,19 @@ def filter_mentions_by_relevance(mentions: List[Dict[str, Any]], keywords: List[
         Filtered list of relevant mentions
     """
     if keywords is None:
-        keywords = [
-            'branch', '@branchapp', 'branch.io', 'deep link', 'deeplink', 
-            'attribution', 'mobile link', 'app link', 'branch sdk',
-            'branch metrics', 'branch analytics'
-        ]
+        keywords = DEFAULT_RELEVANCE_KEYWORDS
     
-    # Convert keywords to lowercase for case-insensitive matching
-    keywords_lower = [kw.lower() for kw in keywords]
+    # Single compiled pattern (cached per keyword set) matched against lowercased text
+    keyword_pattern = _compile_keywords(tuple(keywords))
     
     relevant_mentions = []
     
-    for mention in mentions:
-        text_lower = mention.get('text', '').lower()
-        user_lower = mention.get('user', '').lower()
-        
-        # Check if any keyword appears in text or user
-        is_relevant = any(
-            keyword in text_lower or keyword in user_lower 
-            for keyword in keywords_lower
-        )
-        
-        if is_relevant:
-            relevant_mentions.append(mention)
+    if keyword_pattern is not None:
+        search = keyword_pattern.search
+        for mention in mentions:
+            # Check if any keyword appears in text or user
+            if search(mention.get('text', '').lower()) or search(mention.get('user', '').lower()):
+                relevant_mentions.append(mention)
     
     logging.info(f"Filtered {len(mentions)} mentions down to {len(relevant_mentions)} relevant mentions")
     return relevant_mentions
@@ -189,9 +298,10 @@ def sort_mentions_by_timestamp(mentions: List[Dict[str, Any]], reverse: bool = T
         Sorted list of mentions
     """
     try:
+        # Epoch seconds; mentions without a parseable timestamp sort as 1970
         sorted_mentions = sorted(
             mentions,
-            key=lambda x: datetime.fromisoformat(x.get('timestamp', '1970-01-01T00:00:00').replace('Z', '+00:00')),
+            key=lambda x: _timestamp_epoch(x) or 0.0,
             reverse=reverse
         )
         logging.info(f"Sorted {len(mentions)} mentions by timestamp ({'newest' if reverse else 'oldest'} first)")
@@ -210,7 +320,44 @@ def get_mentions_summary(mentions: List[Dict[str, Any]]) -> Dict[str, Any]:
     Returns:
         Summary dictionary with statistics
     """
-    if not mentions:
+    return _summarize_keyed_mentions([(_timestamp_epoch(mention), mention) for mention in mentions])
+
+def _summarize_keyed_mentions(keyed_mentions: List[Tuple[Optional[float], Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Build summary statistics from (timestamp epoch, mention) pairs in a single pass
+    
+    Mentions whose epoch is None still count towards totals but not the date range.
+    """
+    source_counts = Counter()
+    earliest_epoch = latest_epoch = None
+    earliest_mention = latest_mention = None
+    text_length_sum = 0
+    
+    for epoch, mention in keyed_mentions:
+        source_counts[mention.get('source', 'unknown')] += 1
+        
+        if epoch is not None:
+            if earliest_epoch is None or epoch < earliest_epoch:
+                earliest_epoch, earliest_mention = epoch, mention
+            if latest_epoch is None or epoch > latest_epoch:
+                latest_epoch, latest_mention = epoch, mention
+        
+        text_length_sum += len(mention.get('text', ''))
+    
+    return _format_summary(
+        len(keyed_mentions), dict(source_counts),
+        earliest_epoch, earliest_mention, latest_epoch, latest_mention,
+        text_length_sum
+    )
+
+def _format_summary(total_mentions: int, source_counts: Dict[str, int],
+                    earliest_epoch: Optional[float], earliest_mention: Optional[Dict[str, Any]],
+                    latest_epoch: Optional[float], latest_mention: Optional[Dict[str, Any]],
+                    text_length_sum: int) -> Dict[str, Any]:
+    """
+    Build the summary dictionary from accumulated statistics
+    """
+    if not total_mentions:
         return {
             'total_mentions': 0,
             'by_source': {},
@@ -218,39 +365,20 @@ def get_mentions_summary(mentions: List[Dict[str, Any]]) -> Dict[str, Any]:
             'avg_text_length': 0
         }
     
-    # Count by source
-    source_counts = {}
-    for mention in mentions:
-        source = mention.get('source', 'unknown')
-        source_counts[source] = source_counts.get(source, 0) + 1
-    
-    # Calculate date range
-    timestamps = []
-    text_lengths = []
-    
-    for mention in mentions:
-        try:
-            ts = datetime.fromisoformat(mention.get('timestamp', '').replace('Z', '+00:00'))
-            timestamps.append(ts)
-        except:
-            pass
-        
-        text_lengths.append(len(mention.get('text', '')))
-    
     date_range = None
-    if timestamps:
-        timestamps.sort()
+    if earliest_mention is not None:
+        # Only the two endpoints are converted back to ISO strings
         date_range = {
-            'earliest': timestamps[0].isoformat(),
-            'latest': timestamps[-1].isoformat(),
-            'span_days': (timestamps[-1] - timestamps[0]).days
+            'earliest': parse_iso_timestamp(earliest_mention['timestamp']).isoformat(),
+            'latest': parse_iso_timestamp(latest_mention['timestamp']).isoformat(),
+            'span_days': int((latest_epoch - earliest_epoch) // 86400)
         }
     
     summary = {
-        'total_mentions': len(mentions),
+        'total_mentions': total_mentions,
         'by_source': source_counts,
         'date_range': date_range,
-        'avg_text_length': sum(text_lengths) / len(text_lengths) if text_lengths else 0,
+        'avg_text_length': text_length_sum / total_mentions,
         'processed_at': datetime.now().isoformat()
     }
     
@@ -6,9 +6,11 @@ Target: ~20 latest posts/comments
 
 import logging
 from typing import List, Dict, Any
-from datetime import datetime, timedelta
+from datetime import datetime
 import time
-import random
+import numpy as np
+
+from scrapers._util import clean_text, simulated_timestamps, validate_record
 
 try:
     from facebook_scraper import get_posts
@@ -17,6 +19,21 @@ except ImportError as e:
     logging.warning(f"facebook-scraper not available: {e}")
     FACEBOOK_SCRAPER_AVAILABLE = False
 
+# Minimum spacing between consecutive Facebook post fetches (seconds)
+_MIN_REQUEST_INTERVAL = 1.0
+_last_request_time = 0.0
+
+def _throttle():
+    """
+    Wait only for whatever remains of the minimum interval since the last fetch
+    """
+    global _last_request_time
+    
+    elapsed = time.monotonic() - _last_request_time
+    if elapsed < _MIN_REQUEST_INTERVAL:
+        time.sleep(_MIN_REQUEST_INTERVAL - elapsed)
+    _last_request_time = time.monotonic()
+
 def scrape_facebook_mentions(page_name: str = "Branch", limit: int = 20) -> List[Dict[str, Any]]:
     """
     Scrape recent Facebook posts/comments using facebook-scraper
@@ -31,22 +48,21 @@ def scrape_facebook_mentions(page_name: str = "Branch", limit: int = 20) -> List
     logging.info(f"Starting Facebook scrape for page: {page_name}, limit: {limit}")
     
     posts_data = []
-    collected_ids = set()  # For deduplication
     
     try:
         if FACEBOOK_SCRAPER_AVAILABLE:
             # Try real Facebook scraping
-            return scrape_facebook_real(page_name, limit, posts_data, collected_ids)
+            return scrape_facebook_real(page_name, limit, posts_data)
         else:
             # Fallback to simulated data
-            return scrape_facebook_simulated(page_name, limit, posts_data, collected_ids)
+            return scrape_facebook_simulated(page_name, limit, posts_data)
             
     except Exception as e:
         logging.error(f"Error scraping Facebook: {str(e)}")
         logging.info(f"Falling back to simulated data")
-        return scrape_facebook_simulated(page_name, limit, posts_data, collected_ids)
+        return scrape_facebook_simulated(page_name, limit, posts_data)
 
-def scrape_facebook_real(page_name: str, limit: int, posts_data: List[Dict], collected_ids: set) -> List[Dict[str, Any]]:
+def scrape_facebook_real(page_name: str, limit: int, posts_data: List[Dict]) -> List[Dict[str, Any]]:
     """
     Scrape real Facebook data using facebook-scraper
     """
@@ -65,12 +81,6 @@ def scrape_facebook_real(page_name: str, limit: int, posts_data: List[Dict], col
             # Create unique ID
             post_id = post.get('post_id', f"fb_{post_count}_{int(time.time())}")
             
-            # Skip if we've already collected this post
-            if post_id in collected_ids:
-                continue
-                
-            collected_ids.add(post_id)
-            
             # Extract post data in unified format
             post_text = post.get('text') or post.get('post_text') or ''
             
@@ -91,8 +101,8 @@ def scrape_facebook_real(page_name: str, limit: int, posts_data: List[Dict], col
             posts_data.append(post_data)
             post_count += 1
             
-            # Add delay to be respectful
-            time.sleep(1)
+            # Be respectful: time already spent fetching/processing counts toward the interval
+            _throttle()
             
             if post_count % 5 == 0:
                 logging.info(f"Collected {post_count} Facebook posts so far...")
@@ -104,7 +114,7 @@ def scrape_facebook_real(page_name: str, limit: int, posts_data: List[Dict], col
         logging.error(f"Real Facebook scraping failed: {str(e)}")
         raise e
 
-def scrape_facebook_simulated(page_name: str, limit: int, posts_data: List[Dict], collected_ids: set) -> List[Dict[str, Any]]:
+def scrape_facebook_simulated(page_name: str, limit: int, posts_data: List[Dict]) -> List[Dict[str, Any]]:
     """
     Generate simulated Facebook data for MVP testing
     """
@@ -124,34 +134,36 @@ def scrape_facebook_simulated(page_name: str, limit: int, posts_data: List[Dict]
         "Branch's personalized onboarding features have improved our user retention significantly."
     ]
     
+    post_count = min(limit, len(sample_posts) * 2)  # Allow some repetition
+    
+    # Draw every random field up front in a few vectorized calls (upper bounds are exclusive)
+    now_ts = time.time()
+    rng = np.random.default_rng()
+    id_numbers = rng.integers(100000, 1000000, size=post_count).tolist()
+    timestamps = simulated_timestamps(rng, post_count, 8, now_ts)
+    likes = rng.integers(5, 101, size=post_count).tolist()
+    comments = rng.integers(0, 26, size=post_count).tolist()
+    shares = rng.integers(0, 16, size=post_count).tolist()
+    
     # Create realistic simulated data
-    for i in range(min(limit, len(sample_posts) * 2)):  # Allow some repetition
-        post_id = f"fb_sim_{random.randint(100000, 999999)}_{int(time.time() + i)}"
-        
-        # Skip if we've already collected this ID
-        if post_id in collected_ids:
-            continue
-            
-        collected_ids.add(post_id)
+    for i in range(post_count):
+        post_id = f"fb_sim_{id_numbers[i]}_{int(now_ts) + i}"
         
         post_data = {
             'source': 'facebook',
             'id': post_id,
             'user': page_name,
             'text': clean_text(sample_posts[i % len(sample_posts)]),
-            'timestamp': (datetime.now() - timedelta(days=random.randint(0, 7), hours=random.randint(0, 23))).isoformat(),
+            'timestamp': timestamps[i],
             'url': f"https://facebook.com/{page_name}/posts/{post_id}",
             'metrics': {
-                'likes': random.randint(5, 100),
-                'comments': random.randint(0, 25),
-                'shares': random.randint(0, 15)
+                'likes': likes[i],
+                'comments': comments[i],
+                'shares': shares[i]
             }
         }
         
         posts_data.append(post_data)
-        
-        # Add realistic delay
-        time.sleep(0.2)
             
         if (i + 1) % 5 == 0:
             logging.info(f"Generated {i + 1} simulated Facebook posts so far...")
@@ -159,39 +171,5 @@ def scrape_facebook_simulated(page_name: str, limit: int, posts_data: List[Dict]
     logging.info(f"Generated {len(posts_data)} simulated Facebook posts (MVP mode)")
     return posts_data
 
-def clean_text(text: str) -> str:
-    """
-    Clean and normalize Facebook post text
-    
-    Args:
-        text: Raw post text
-        
-    Returns:
-        Cleaned text
-    """
-    if not text:
-        return ""
-        
-    # Remove excessive whitespace and normalize
-    cleaned = " ".join(text.split())
-    
-    # Ensure proper encoding
-    try:
-        cleaned = cleaned.encode('utf-8', errors='ignore').decode('utf-8')
-    except Exception:
-        pass
-        
-    return cleaned.strip()
-
-def validate_facebook_data(post_data: Dict[str, Any]) -> bool:
-    """
-    Validate that Facebook post data has required fields
-    
-    Args:
-        post_data: Post data dictionary
-        
-    Returns:
-        True if valid, False otherwise
-    """
-    required_fields = ['source', 'id', 'user', 'text', 'timestamp']
-    return all(field in post_data and post_data[field] for field in required_fields)
+# Facebook post records share the unified-format validation
+validate_facebook_data = validate_record
@@ -4,19 +4,73 @@ Fetches recent reviews using google-play-scraper
 Target: ~100 newest reviews of Branch app
 """
 
+import atexit
 import logging
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
+from typing import Iterator, List, Dict, Any, Optional
+from datetime import datetime
 import time
-import random
+import numpy as np
+
+from scrapers._util import clean_text, simulated_timestamps, validate_record
 
 try:
     from google_play_scraper import app, reviews, Sort
+    from google_play_scraper.exceptions import ExtraHTTPError, NotFoundError
+    from google_play_scraper.utils import request as gp_request
     GOOGLE_PLAY_SCRAPER_AVAILABLE = True
 except ImportError as e:
     logging.warning(f"google-play-scraper not available: {e}")
     GOOGLE_PLAY_SCRAPER_AVAILABLE = False
 
+_GP_TIMEOUT_SECONDS = 30
+
+def _pooled_urlopen(obj) -> str:
+    """
+    Drop-in replacement for google_play_scraper's _urlopen backed by the shared session
+    
+    Args:
+        obj: URL string (GET) or urllib Request (POST with body and headers)
+        
+    Returns:
+        Decoded response body
+    """
+    if isinstance(obj, str):
+        response = _gp_session.get(obj, timeout=_GP_TIMEOUT_SECONDS)
+    else:
+        response = _gp_session.request(
+            obj.get_method(),
+            obj.full_url,
+            data=obj.data,
+            headers=dict(obj.header_items()),
+            timeout=_GP_TIMEOUT_SECONDS
+        )
+    
+    # Mirror the library's own error mapping so its retry logic behaves the same
+    if response.status_code == 404:
+        raise NotFoundError("App not found(404).")
+    if response.status_code >= 400:
+        raise ExtraHTTPError(f"App not found. Status code {response.status_code} returned.")
+    
+    return response.content.decode('UTF-8')
+
+# google-play-scraper opens a fresh urllib connection per request; when requests is installed,
+# route it through a shared keep-alive session so app and review page requests reuse connections.
+# Without the library the simulated scraper is used and neither is needed.
+if GOOGLE_PLAY_SCRAPER_AVAILABLE and hasattr(gp_request, '_urlopen'):
+    try:
+        import requests
+        from requests.adapters import HTTPAdapter
+    except ImportError as e:
+        logging.debug(f"requests not available, google-play-scraper keeps urllib: {e}")
+    else:
+        _gp_session = requests.Session()
+        _gp_session.mount('https://', HTTPAdapter(pool_connections=20, pool_maxsize=20))
+        atexit.register(_gp_session.close)
+        gp_request._urlopen = _pooled_urlopen
+
+# Pause between review page requests (reviews within a page are already in memory)
+_PAGE_DELAY_SECONDS = 0.5
+
 def scrape_google_play_reviews(app_id: str = "io.branch.referral.branch", limit: int = 100) -> List[Dict[str, Any]]:
     """
     Scrape recent Google Play reviews using google-play-scraper
@@ -34,12 +88,8 @@ def scrape_google_play_reviews(app_id: str = "io.branch.referral.branch", limit:
     collected_ids = set()  # For deduplication
     
     try:
-        if GOOGLE_PLAY_SCRAPER_AVAILABLE:
-            # Try real Google Play scraping
-            return scrape_google_play_real(app_id, limit, reviews_data, collected_ids)
-        else:
-            # Fallback to simulated data
-            return scrape_google_play_simulated(app_id, limit, reviews_data, collected_ids)
+        # Real scraping when google-play-scraper is installed, simulated data otherwise
+        return _scrape_impl(app_id, limit, reviews_data, collected_ids)
             
     except Exception as e:
         logging.error(f"Error scraping Google Play: {str(e)}")
@@ -58,61 +108,77 @@ def scrape_google_play_real(app_id: str, limit: int, reviews_data: List[Dict], c
         app_name = app_info.get('title', 'Unknown App')
         logging.info(f"Found app: {app_name}")
         
-        # Get reviews sorted by newest
-        result, continuation_token = reviews(
-            app_id,
-            lang='en',
-            country='us',
-            sort=Sort.NEWEST,
-            count=limit,
-            filter_score_with=None
-        )
+        # Fallback timestamp for reviews without a parsed date
+        now_iso = datetime.now().isoformat()
+        url_prefix = f"https://play.google.com/store/apps/details?id={app_id}&reviewId="
+        append_review = reviews_data.append
+        
+        # One app_info dict shared by every review from this run; consumers must not mutate it
+        shared_app_info = {'app_id': app_id, 'app_name': app_name}
         
         review_count = 0
-        for review in result:
-            if review_count >= limit:
-                break
-                
-            # Create unique ID from reviewId or generate one
-            review_id = review.get('reviewId', f"gp_{review_count}_{int(time.time())}")
+        continuation_token = None
+        
+        # Get reviews sorted by newest, paging until enough usable reviews are collected
+        while review_count < limit:
+            result, continuation_token = reviews(
+                app_id,
+                lang='en',
+                country='us',
+                sort=Sort.NEWEST,
+                count=limit,
+                filter_score_with=None,
+                continuation_token=continuation_token
+            )
             
-            # Skip if we've already collected this review
-            if review_id in collected_ids:
-                continue
+            for review in result:
+                if review_count >= limit:
+                    break
                 
-            collected_ids.add(review_id)
-            
-            # Extract review data in unified format
-            review_content = review.get('content', '').strip()
-            if not review_content:
-                continue
+                review_get = review.get
+                
+                # Create unique ID from reviewId or generate one
+                review_id = review_get('reviewId') or f"gp_{review_count}_{int(time.time())}"
+                
+                # Skip if we've already collected this review
+                if review_id in collected_ids:
+                    continue
+                
+                collected_ids.add(review_id)
                 
-            review_data = {
-                'source': 'google_play',
-                'id': str(review_id),
-                'user': review.get('userName', 'Anonymous'),
-                'text': clean_text(review_content),
-                'timestamp': review.get('at', datetime.now()).isoformat() if isinstance(review.get('at'), datetime) else datetime.now().isoformat(),
-                'url': f"https://play.google.com/store/apps/details?id={app_id}&reviewId={review_id}",
-                'metrics': {
-                    'rating': review.get('score', 0),
-                    'helpful_count': review.get('thumbsUpCount', 0),
-                    'total_thumbs': review.get('thumbsUpCount', 0)
-                },
-                'app_info': {
-                    'app_id': app_id,
-                    'app_name': app_name
+                # Extract review data in unified format
+                review_content = (review_get('content') or '').strip()
+                if not review_content:
+                    continue
+                
+                review_at = review_get('at')
+                thumbs = review_get('thumbsUpCount', 0)
+                review_data = {
+                    'source': 'google_play',
+                    'id': str(review_id),
+                    'user': review_get('userName', 'Anonymous'),
+                    'text': clean_text(review_content),
+                    'timestamp': review_at.isoformat() if isinstance(review_at, datetime) else now_iso,
+                    'url': f"{url_prefix}{review_id}",
+                    'metrics': {
+                        'rating': review_get('score', 0),
+                        'helpful_count': thumbs,
+                        'total_thumbs': thumbs
+                    },
+                    'app_info': shared_app_info
                 }
-            }
-            
-            reviews_data.append(review_data)
-            review_count += 1
-            
-            # Add small delay
-            time.sleep(0.1)
+                
+                append_review(review_data)
+                review_count += 1
+                
+                if review_count % 25 == 0:
+                    logging.info(f"Collected {review_count} Google Play reviews so far...")
             
-            if review_count % 25 == 0:
-                logging.info(f"Collected {review_count} Google Play reviews so far...")
+            # Stop when the listing is exhausted; otherwise pause once before the next page
+            if not result or getattr(continuation_token, 'token', None) is None:
+                break
+            if review_count < limit:
+                time.sleep(_PAGE_DELAY_SECONDS)
         
         logging.info(f"Successfully collected {len(reviews_data)} reviews from Google Play")
         return reviews_data
@@ -127,6 +193,26 @@ def scrape_google_play_simulated(app_id: str, limit: int, reviews_data: List[Dic
     """
     logging.warning("Using simulated Google Play review data for MVP testing")
     
+    reviews_data.extend(iter_google_play_simulated(app_id, limit, collected_ids))
+    
+    logging.info(f"Generated {len(reviews_data)} simulated Google Play reviews (MVP mode)")
+    return reviews_data
+
+def iter_google_play_simulated(app_id: str, limit: int, collected_ids: Optional[set] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily generate simulated Google Play reviews, one unified-format record at a time
+    
+    Args:
+        app_id: Google Play app ID used in review URLs
+        limit: Maximum number of reviews to generate
+        collected_ids: Optional set of IDs to skip and update
+        
+    Yields:
+        Simulated review dictionaries
+    """
+    if collected_ids is None:
+        collected_ids = set()
+    
     # Sample Google Play reviews about Branch
     sample_reviews = [
         "Branch has made deep linking so much easier for our app. The SDK integration was smooth and the analytics are fantastic. Highly recommend!",
@@ -147,9 +233,25 @@ def scrape_google_play_simulated(app_id: str, limit: int, reviews_data: List[Dic
         "DevSarah", "GrowthHacker", "ProductManager_Jane", "iOSExpert", "AndroidDev_Tom"
     ]
     
+    review_count = min(limit, len(sample_reviews) * 10)  # Allow repetition
+    sample_count = len(sample_reviews)
+    
+    # Draw every random field up front in a few vectorized calls (upper bounds are exclusive)
+    now_ts = time.time()
+    rng = np.random.default_rng()
+    user_indices = rng.integers(0, len(sample_users), size=review_count).tolist()
+    id_numbers = rng.integers(100000, 1000000, size=review_count).tolist()
+    timestamps = simulated_timestamps(rng, review_count, 31, now_ts)
+    ratings = rng.integers(3, 6, size=review_count).tolist()  # Mostly positive reviews
+    helpful_counts = rng.integers(0, 26, size=review_count).tolist()
+    thumbs_counts = rng.integers(0, 31, size=review_count).tolist()
+    
+    # One app_info dict shared by every simulated review; consumers must not mutate it
+    shared_app_info = {'app_id': app_id, 'app_name': 'Branch (Simulated)'}
+    
     # Create realistic simulated data
-    for i in range(min(limit, len(sample_reviews) * 10)):  # Allow repetition
-        review_id = f"gp_sim_{random.randint(100000, 999999)}_{int(time.time() + i)}"
+    for i in range(review_count):
+        review_id = f"gp_sim_{id_numbers[i]}_{int(now_ts) + i}"
         
         # Skip if we've already collected this ID
         if review_id in collected_ids:
@@ -160,65 +262,25 @@ def scrape_google_play_simulated(app_id: str, limit: int, reviews_data: List[Dic
         review_data = {
             'source': 'google_play',
             'id': review_id,
-            'user': random.choice(sample_users),
-            'text': clean_text(sample_reviews[i % len(sample_reviews)]),
-            'timestamp': (datetime.now() - timedelta(days=random.randint(0, 30), hours=random.randint(0, 23))).isoformat(),
+            'user': sample_users[user_indices[i]],
+            'text': clean_text(sample_reviews[i % sample_count]),
+            'timestamp': timestamps[i],
             'url': f"https://play.google.com/store/apps/details?id={app_id}&reviewId={review_id}",
             'metrics': {
-                'rating': random.randint(3, 5),  # Mostly positive reviews
-                'helpful_count': random.randint(0, 25),
-                'total_thumbs': random.randint(0, 30)
+                'rating': ratings[i],
+                'helpful_count': helpful_counts[i],
+                'total_thumbs': thumbs_counts[i]
             },
-            'app_info': {
-                'app_id': app_id,
-                'app_name': 'Branch (Simulated)'
-            }
+            'app_info': shared_app_info
         }
         
-        reviews_data.append(review_data)
-        
-        # Add realistic delay
-        time.sleep(0.05)
+        yield review_data
             
         if (i + 1) % 25 == 0:
             logging.info(f"Generated {i + 1} simulated Google Play reviews so far...")
-    
-    logging.info(f"Generated {len(reviews_data)} simulated Google Play reviews (MVP mode)")
-    return reviews_data
 
-def clean_text(text: str) -> str:
-    """
-    Clean and normalize Google Play review text
-    
-    Args:
-        text: Raw review text
-        
-    Returns:
-        Cleaned text
-    """
-    if not text:
-        return ""
-        
-    # Remove excessive whitespace and normalize
-    cleaned = " ".join(text.split())
-    
-    # Ensure proper encoding
-    try:
-        cleaned = cleaned.encode('utf-8', errors='ignore').decode('utf-8')
-    except Exception:
-        pass
-        
-    return cleaned.strip()
+# Google Play review records share the unified-format validation
+validate_google_play_data = validate_record
 
-def validate_google_play_data(review_data: Dict[str, Any]) -> bool:
-    """
-    Validate that Google Play review data has required fields
-    
-    Args:
-        review_data: Review data dictionary
-        
-    Returns:
-        True if valid, False otherwise
-    """
-    required_fields = ['source', 'id', 'user', 'text', 'timestamp']
-    return all(field in review_data and review_data[field] for field in required_fields)
+# Scraping implementation, resolved once at import from library availability
+_scrape_impl = scrape_google_play_real if GOOGLE_PLAY_SCRAPER_AVAILABLE else scrape_google_play_simulated
@@ -0,0 +1,108 @@
+"""
+Branch Social Listening Scraper - Cross-Run Deduplication Module
+Remembers which mentions were already written to Google Sheets in a small SQLite table
+Each row = {source, id}
+"""
+
+import logging
+import os
+import sqlite3
+from typing import List, Dict, Any, Optional
+
+DEFAULT_SEEN_IDS_DB = os.path.join('~', '.branch_scraper', 'seen_ids.sqlite3')
+
+def get_seen_ids_path() -> Optional[str]:
+    """
+    Resolve the seen-ID database path
+    
+    Returns:
+        Absolute database path, or None when cross-run deduplication is disabled
+        (SEEN_IDS_DB set to an empty value)
+    """
+    path = os.getenv('SEEN_IDS_DB', DEFAULT_SEEN_IDS_DB)
+    if not path:
+        return None
+    return os.path.expanduser(path)
+
+def _connect(path: str) -> sqlite3.Connection:
+    """
+    Open the seen-ID database, creating it on first use
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    
+    connection = sqlite3.connect(path)
+    connection.execute(
+        'CREATE TABLE IF NOT EXISTS seen_ids ('
+        'source TEXT NOT NULL, id TEXT NOT NULL, PRIMARY KEY (source, id)'
+        ') WITHOUT ROWID'
+    )
+    return connection
+
+def filter_unseen_mentions(mentions: List[Dict[str, Any]], path: str = None) -> List[Dict[str, Any]]:
+    """
+    Drop mentions that a previous run already stored
+    
+    Args:
+        mentions: List of mention dictionaries
+        path: Database path (defaults to SEEN_IDS_DB environment variable)
+    
+    Returns:
+        Mentions whose (source, id) has not been marked as seen
+    """
+    path = path or get_seen_ids_path()
+    if not path or not mentions:
+        return mentions
+    
+    try:
+        connection = _connect(path)
+        try:
+            lookup = connection.execute
+            unseen = [
+                mention for mention in mentions
+                if lookup(
+                    'SELECT 1 FROM seen_ids WHERE source = ? AND id = ?',
+                    (mention.get('source', ''), str(mention.get('id', '')))
+                ).fetchone() is None
+            ]
+        finally:
+            connection.close()
+    except (sqlite3.Error, OSError) as e:
+        logging.warning(f"⚠️ Seen-ID store unavailable ({e}), skipping cross-run deduplication")
+        return mentions
+    
+    skipped = len(mentions) - len(unseen)
+    if skipped:
+        logging.info(f"🔁 Skipping {skipped} mentions already stored by a previous run")
+    
+    return unseen
+
+def mark_mentions_seen(mentions: List[Dict[str, Any]], path: str = None) -> bool:
+    """
+    Record mentions as stored so later runs skip them
+    
+    Args:
+        mentions: List of mention dictionaries that were successfully stored
+        path: Database path (defaults to SEEN_IDS_DB environment variable)
+    
+    Returns:
+        Boolean indicating success
+    """
+    path = path or get_seen_ids_path()
+    if not path or not mentions:
+        return True
+    
+    try:
+        connection = _connect(path)
+        try:
+            with connection:
+                connection.executemany(
+                    'INSERT OR IGNORE INTO seen_ids (source, id) VALUES (?, ?)',
+                    [(mention.get('source', ''), str(mention.get('id', ''))) for mention in mentions]
+                )
+        finally:
+            connection.close()
+        return True
+    
+    except (sqlite3.Error, OSError) as e:
+        logging.warning(f"⚠️ Failed to record stored mention IDs: {e}")
+        return False
@@ -4,17 +4,173 @@ Uses gspread library for Google Sheets API integration
 Each row = {timestamp, source, id, user, text, sentiment_label, sentiment_score}
 """
 
+import hashlib
 import logging
 import os
 import json
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+import stat
+from itertools import chain, islice
+from urllib.parse import quote
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Tuple
 import gspread
+import numpy as np
 from google.auth.exceptions import GoogleAuthError
+from google.auth.transport.requests import Request
+from google.oauth2 import service_account
+from gspread.urls import SPREADSHEET_VALUES_APPEND_URL
+from gspread.utils import absolute_range_name
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+from scrapers.data_processor import parse_iso_timestamp
+from store.dedup import filter_unseen_mentions, mark_mentions_seen
 
 # Global Google Sheets client (lazy loading)
 _sheets_client = None
 
+# Cached access tokens are reused only while at least this much lifetime remains
+_TOKEN_MIN_REMAINING = timedelta(seconds=300)
+
+# Access tokens are cached in this per-user directory (shared with the seen-ID store)
+_TOKEN_CACHE_DIR = os.path.join('~', '.branch_scraper')
+
+# Batches at least this large are encoded with orjson and posted as one raw values.append call
+_RAW_APPEND_MIN_ROWS = 1000
+
+# Mentions are formatted and appended in chunks of this many, so any iterable can be streamed
+# (kept above _RAW_APPEND_MIN_ROWS so big uploads still take the orjson path)
+_APPEND_CHUNK_ROWS = 5000
+
+# Spreadsheet handles by name, so repeat appends skip the Drive lookup
+_SPREADSHEET_CACHE: Dict[str, gspread.Spreadsheet] = {}
+
+# First worksheet by spreadsheet id (spreadsheet.sheet1 re-fetches metadata on every access)
+_WORKSHEET_CACHE: Dict[str, gspread.Worksheet] = {}
+
+# (spreadsheet id, worksheet id) pairs whose header row was verified in this process
+_verified_headers = set()
+
+def _token_cache_dir() -> Optional[str]:
+    """
+    Private per-user directory for the token cache, created 0700 on first use
+    
+    Returns:
+        Directory path, or None if it is not a directory owned by the current user
+    """
+    cache_dir = os.path.expanduser(_TOKEN_CACHE_DIR)
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        dir_stat = os.lstat(cache_dir)
+        if not stat.S_ISDIR(dir_stat.st_mode) or dir_stat.st_uid != os.getuid():
+            return None
+        if dir_stat.st_mode & 0o077:
+            os.chmod(cache_dir, 0o700)
+    except OSError as e:
+        logging.debug(f"Google access token cache directory unavailable: {e}")
+        return None
+    
+    return cache_dir
+
+def _token_cache_path(service_account_file: str) -> Optional[str]:
+    """
+    Token cache file for a keyfile; a replaced or edited keyfile gets a new cache entry
+    """
+    cache_dir = _token_cache_dir()
+    if cache_dir is None:
+        return None
+    
+    key_stat = os.stat(service_account_file)
+    key = f"{os.path.abspath(service_account_file)}:{key_stat.st_mtime_ns}"
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+    return os.path.join(cache_dir, f"sheets_token_{digest}.json")
+
+def _is_private_file(file_stat: os.stat_result) -> bool:
+    """
+    True for a regular file owned by the current user with no group/other permission bits
+    """
+    return (
+        stat.S_ISREG(file_stat.st_mode)
+        and file_stat.st_uid == os.getuid()
+        and not file_stat.st_mode & 0o077
+    )
+
+def _utcnow() -> datetime:
+    """
+    Current UTC time as a naive datetime, matching google-auth's expiry convention
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def _load_cached_token(cache_path: str) -> Optional[Tuple[str, datetime]]:
+    """
+    Load a cached access token if it is still valid for a while
+    
+    Returns:
+        (token, expiry) or None if there is no usable cached token
+    """
+    try:
+        fd = os.open(cache_path, os.O_RDONLY | os.O_NOFOLLOW)
+        with os.fdopen(fd, 'r', encoding='utf-8') as f:
+            if not _is_private_file(os.fstat(f.fileno())):
+                logging.warning(f"⚠️ Ignoring Google access token cache with unsafe ownership or permissions: {cache_path}")
+                return None
+            cached = json.load(f)
+        expiry = datetime.fromisoformat(cached['expiry'])
+        token = cached['token']
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    
+    if expiry - _utcnow() < _TOKEN_MIN_REMAINING:
+        return None
+    
+    return token, expiry
+
+def _save_cached_token(cache_path: str, credentials) -> None:
+    """
+    Persist the access token and its expiry (never the private key), readable by the owner only
+    """
+    if not credentials.token or not credentials.expiry:
+        return
+    
+    try:
+        fd = os.open(cache_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_NOFOLLOW, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            os.fchmod(f.fileno(), 0o600)
+            if not _is_private_file(os.fstat(f.fileno())):
+                return
+            json.dump({'token': credentials.token, 'expiry': credentials.expiry.isoformat()}, f)
+    except OSError as e:
+        logging.debug(f"Could not cache Google access token: {e}")
+
+def _service_account_client(service_account_file: str, scopes: List[str]) -> gspread.Client:
+    """
+    Build a gspread client, reusing a cached access token across processes when possible
+    
+    Signing the service account JWT and exchanging it for a token happens at most
+    once per token lifetime; the credentials still refresh themselves once the cached
+    token expires. Set SHEETS_TOKEN_CACHE=0 to always authenticate fresh.
+    """
+    if os.getenv('SHEETS_TOKEN_CACHE', '1') == '0':
+        return gspread.service_account(filename=service_account_file, scopes=scopes)
+    
+    credentials = service_account.Credentials.from_service_account_file(service_account_file, scopes=scopes)
+    cache_path = _token_cache_path(service_account_file)
+    
+    cached = _load_cached_token(cache_path) if cache_path else None
+    if cached is not None:
+        logging.info("🔑 Reusing cached Google access token")
+        credentials.token, credentials.expiry = cached
+    else:
+        credentials.refresh(Request())
+        if cache_path:
+            _save_cached_token(cache_path, credentials)
+    
+    return gspread.authorize(credentials)
+
 def setup_google_sheets_auth():
     """
     Set up Google Sheets authentication using service account
@@ -48,7 +204,7 @@ def setup_google_sheets_auth():
         ]
         
         # Authenticate with Google Sheets with expanded scopes
-        _sheets_client = gspread.service_account(filename=service_account_file, scopes=scopes)
+        _sheets_client = _service_account_client(service_account_file, scopes)
         
         logging.info("✅ Google Sheets authentication successful")
         return _sheets_client
@@ -70,6 +226,10 @@ def get_or_create_spreadsheet(spreadsheet_name: str) -> Optional[gspread.Spreads
     Returns:
         gspread Spreadsheet object or None if failed
     """
+    use_cache = os.getenv('SHEETS_CACHE_DISABLE', '0') != '1'
+    if use_cache and spreadsheet_name in _SPREADSHEET_CACHE:
+        return _SPREADSHEET_CACHE[spreadsheet_name]
+    
     client = setup_google_sheets_auth()
     
     if not client:
@@ -79,6 +239,8 @@ def get_or_create_spreadsheet(spreadsheet_name: str) -> Optional[gspread.Spreads
         # Try to open existing spreadsheet
         spreadsheet = client.open(spreadsheet_name)
         logging.info(f"📊 Opened existing spreadsheet: {spreadsheet_name}")
+        if use_cache:
+            _SPREADSHEET_CACHE[spreadsheet_name] = spreadsheet
         return spreadsheet
         
     except gspread.SpreadsheetNotFound:
@@ -93,6 +255,8 @@ def get_or_create_spreadsheet(spreadsheet_name: str) -> Optional[gspread.Spreads
             logging.info(f"📋 Spreadsheet URL: {spreadsheet.url}")
             logging.info(f"💡 Note: Spreadsheet has service account access only. Share manually if external access needed.")
             
+            if use_cache:
+                _SPREADSHEET_CACHE[spreadsheet_name] = spreadsheet
             return spreadsheet
             
         except Exception as e:
@@ -139,22 +303,38 @@ def setup_worksheet_headers(worksheet: gspread.Worksheet) -> bool:
         logging.error(f"❌ Failed to setup worksheet headers: {e}")
         return False
 
-def format_data_for_sheets(data: List[Dict[str, Any]]) -> List[List[str]]:
+def format_data_for_sheets(data: List[Dict[str, Any]], scores: Optional[np.ndarray] = None) -> List[List[str]]:
     """
     Format mention data for Google Sheets
     
     Args:
         data: List of mention dictionaries with sentiment analysis
+        scores: Optional sentiment scores aligned with data (e.g. straight from the
+                sentiment stage); when given they replace each item's sentiment_score
+                and are rounded like per-row scores. Non-finite scores become 0.5.
         
     Returns:
         List of rows formatted for Google Sheets
     """
     formatted_rows = []
+    append_row = formatted_rows.append
     
-    for item in data:
+    score_strings = None
+    if scores is not None:
+        scores = np.asarray(scores, dtype=np.float64)
+        if len(scores) != len(data):
+            raise ValueError(f"Got {len(scores)} scores for {len(data)} rows")
+        # Only the non-finite check is vectorized; rounding uses round() on Python floats so the
+        # strings match the per-row path exactly (np.round resolves ties differently)
+        score_strings = [str(round(score, 4)) for score in np.where(np.isfinite(scores), scores, 0.5).tolist()]
+    
+    # Rows without a timestamp get the formatting time; compute it once per batch
+    batch_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')
+    
+    for index, item in enumerate(data):
         try:
             # Extract required fields
-            timestamp = item.get('timestamp', datetime.now().isoformat())
+            timestamp = item.get('timestamp')
             source = item.get('source', 'unknown')
             item_id = str(item.get('id', ''))
             user = item.get('user', item.get('username', ''))
@@ -165,7 +345,9 @@ def format_data_for_sheets(data: List[Dict[str, Any]]) -> List[List[str]]:
             sentiment_score = item.get('sentiment_score', 0.5)
             
             # Ensure proper formatting
-            if isinstance(sentiment_score, (int, float)):
+            if score_strings is not None:
+                sentiment_score = score_strings[index]
+            elif isinstance(sentiment_score, (int, float)):
                 sentiment_score = round(float(sentiment_score), 4)
             else:
                 sentiment_score = 0.5
@@ -178,10 +360,12 @@ def format_data_for_sheets(data: List[Dict[str, Any]]) -> List[List[str]]:
                     text = text[:1000] + "..."
             
             # Format timestamp
-            if isinstance(timestamp, str):
+            if 'timestamp' not in item:
+                timestamp = batch_timestamp
+            elif isinstance(timestamp, str):
                 try:
                     # Parse and reformat timestamp
-                    dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+                    dt = parse_iso_timestamp(timestamp)
                     timestamp = dt.strftime('%Y-%m-%d %H:%M:%S UTC')
                 except:
                     pass
@@ -196,13 +380,13 @@ def format_data_for_sheets(data: List[Dict[str, Any]]) -> List[List[str]]:
                 str(sentiment_score)
             ]
             
-            formatted_rows.append(formatted_row)
+            append_row(formatted_row)
             
         except Exception as e:
             logging.error(f"❌ Error formatting data row: {e}")
             # Add error row to maintain data integrity
-            formatted_rows.append([
-                datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC'),
+            append_row([
+                batch_timestamp,
                 'error',
                 '',
                 '',
@@ -213,26 +397,67 @@ def format_data_for_sheets(data: List[Dict[str, Any]]) -> List[List[str]]:
     
     return formatted_rows
 
-def append_to_google_sheet(data: List[Dict[str, Any]], spreadsheet_name: str = None) -> bool:
+def _append_rows_raw(spreadsheet: gspread.Spreadsheet, worksheet: gspread.Worksheet, rows: List[List[str]]) -> bool:
+    """
+    Append rows through the client's authorized HTTP session with an orjson-encoded body
+    
+    gspread encodes request bodies with the stdlib json module; for large batches the
+    orjson encoding is markedly cheaper. Error handling and retries stay with gspread.
+    
+    Returns:
+        True if the rows were sent, False if the raw path is unavailable (caller should use append_rows)
+    """
+    http_client = getattr(spreadsheet.client, 'http_client', spreadsheet.client)
+    if not ORJSON_AVAILABLE or not hasattr(http_client, 'request'):
+        return False
+    
+    range_label = absolute_range_name(worksheet.title, 'A1')
+    http_client.request(
+        'post',
+        SPREADSHEET_VALUES_APPEND_URL % (spreadsheet.id, quote(range_label)),
+        params={'valueInputOption': 'RAW', 'insertDataOption': 'INSERT_ROWS'},
+        data=orjson.dumps({'majorDimension': 'ROWS', 'values': rows}),
+        headers={'Content-Type': 'application/json'}
+    )
+    return True
+
+def _iter_unseen_chunks(data: Iterable[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield non-empty chunks of mentions not already stored by a previous run
+    """
+    data_iter = iter(data)
+    while True:
+        chunk = list(islice(data_iter, _APPEND_CHUNK_ROWS))
+        if not chunk:
+            return
+        chunk = filter_unseen_mentions(chunk)
+        if chunk:
+            yield chunk
+
+def append_to_google_sheet(data: Iterable[Dict[str, Any]], spreadsheet_name: str = None) -> bool:
     """
     Append structured results to Google Sheet using gspread
     
     Args:
-        data: List of dictionaries containing scraped and analyzed data
+        data: Dictionaries containing scraped and analyzed data; any iterable (including
+              generators) is consumed in chunks, so it never has to be fully materialized
         spreadsheet_name: Name of Google Sheet to write to (defaults to env variable)
         
     Returns:
         Boolean indicating success/failure
     """
-    if not data:
-        logging.warning("No data provided to append to Google Sheet")
+    # Drop mentions already written by a previous run
+    chunks = _iter_unseen_chunks(data)
+    first_chunk = next(chunks, None)
+    if first_chunk is None:
+        logging.warning("No new data provided to append to Google Sheet")
         return True
     
     # Use spreadsheet name from environment if not provided
     if not spreadsheet_name:
         spreadsheet_name = os.getenv('GOOGLE_SHEET_NAME', 'Branch Social Listening Data')
     
-    logging.info(f"📊 Appending {len(data)} records to Google Sheet: {spreadsheet_name}")
+    logging.info(f"📊 Appending records to Google Sheet: {spreadsheet_name}")
     
     try:
         # Get or create spreadsheet
@@ -243,32 +468,50 @@ def append_to_google_sheet(data: List[Dict[str, Any]], spreadsheet_name: str = N
             return False
         
         # Get the first worksheet (or create it)
-        try:
-            worksheet = spreadsheet.sheet1
-        except Exception:
-            # Create default worksheet if none exists
-            worksheet = spreadsheet.add_worksheet(title="Sheet1", rows="1000", cols="26")
+        worksheet = _WORKSHEET_CACHE.get(spreadsheet.id)
+        if worksheet is None:
+            try:
+                worksheet = spreadsheet.sheet1
+            except Exception:
+                # Create default worksheet if none exists
+                worksheet = spreadsheet.add_worksheet(title="Sheet1", rows="1000", cols="26")
+            
+            if os.getenv('SHEETS_CACHE_DISABLE', '0') != '1':
+                _WORKSHEET_CACHE[spreadsheet.id] = worksheet
         
-        # Setup headers
-        if not setup_worksheet_headers(worksheet):
-            logging.error("❌ Failed to setup worksheet headers")
-            return False
+        # Setup headers (once per worksheet per process; later appends skip the read/update roundtrips)
+        header_key = (spreadsheet.id, worksheet.id)
+        if header_key not in _verified_headers:
+            if not setup_worksheet_headers(worksheet):
+                logging.error("❌ Failed to setup worksheet headers")
+                return False
+            _verified_headers.add(header_key)
         
-        # Format data for sheets
-        formatted_rows = format_data_for_sheets(data)
+        appended_count = 0
+        for chunk in chain([first_chunk], chunks):
+            # Format data for sheets
+            formatted_rows = format_data_for_sheets(chunk)
+            
+            if not formatted_rows:
+                continue
+            
+            # Use more efficient approach: gspread's append method finds next row automatically
+            # This avoids loading all existing data which is O(n) and slow for large datasets
+            logging.info(f"📝 Appending {len(formatted_rows)} rows to worksheet...")
+            
+            # Append the chunk in one batch; large batches skip gspread's stdlib JSON encoding
+            if len(formatted_rows) < _RAW_APPEND_MIN_ROWS or not _append_rows_raw(spreadsheet, worksheet, formatted_rows):
+                worksheet.append_rows(formatted_rows, value_input_option='RAW', insert_data_option='INSERT_ROWS')
+            
+            # Only remember mentions once they are safely in the sheet
+            mark_mentions_seen(chunk)
+            appended_count += len(formatted_rows)
         
-        if not formatted_rows:
+        if not appended_count:
             logging.warning("No valid data to append after formatting")
             return True
         
-        # Use more efficient approach: gspread's append method finds next row automatically
-        # This avoids loading all existing data which is O(n) and slow for large datasets
-        logging.info(f"📝 Appending {len(formatted_rows)} rows to worksheet...")
-        
-        # Append all rows in batch using gspread's efficient append method
-        worksheet.append_rows(formatted_rows, value_input_option='RAW')
-        
-        logging.info(f"✅ Successfully appended {len(formatted_rows)} records to Google Sheet")
+        logging.info(f"✅ Successfully appended {appended_count} records to Google Sheet")
         logging.info(f"📊 Spreadsheet URL: {spreadsheet.url}")
         
         return True